@@ -1,11 +1,40 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
-from typing import Optional
-from water_quality_model import WaterQualityEvaluator
+from functools import lru_cache
+import msgspec
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel, conlist
+from typing import List, Optional
+from water_quality_model import compile_kernels, get_default_evaluator
 
-app = FastAPI()
-quality_model = WaterQualityEvaluator()
+app = FastAPI(default_response_class=ORJSONResponse)
+quality_model = get_default_evaluator()
+
+# Request field name -> parameter name used by WaterQualityEvaluator
+API_TO_INTERNAL = {
+    "Temperature": "Temperature",
+    "pH": "pH",
+    "Turbidity": "Turbidity",
+    "DissolvedOxygen": "Dissolved Oxygen",
+    "Conductivity": "Conductivity",
+    "TotalDissolvedSolids": "Total Dissolved Solids",
+    "Nitrate": "Nitrate",
+    "Phosphate": "Phosphate",
+    "TotalColiforms": "Total Coliforms",
+    "Ecoli": "E. coli",
+    "BOD": "BOD",
+    "COD": "COD",
+    "Hardness": "Hardness",
+    "Alkalinity": "Alkalinity",
+    "Iron": "Iron",
+}
+PARAMETERS = tuple(API_TO_INTERNAL.values())
+# Column of each request field in the evaluator's canonical parameter order
+COLUMNS = np.array([quality_model.parameters.index(parameter) for parameter in PARAMETERS])
+# Largest number of samples accepted by /evaluate_batch
+MAX_BATCH_SAMPLES = 1000
 
 
 class WaterQualityData(BaseModel):
@@ -13,6 +42,9 @@ class WaterQualityData(BaseModel):
     Pydantic model to define the structure and validation rules for input data.
     """
 
+    class Config:
+        frozen = True
+
     Temperature: Optional[float] = None
     pH: Optional[float] = None
     Turbidity: Optional[float] = None
@@ -30,6 +62,17 @@ class WaterQualityData(BaseModel):
     Iron: Optional[float] = None
 
 
+# msgspec mirror of WaterQualityData. /evaluate decodes request bodies with
+# it directly, which is much cheaper than Pydantic parsing; the Pydantic
+# model is kept for /evaluate_batch and the OpenAPI schema.
+WaterQualitySample = msgspec.defstruct(
+    "WaterQualitySample",
+    [(field, Optional[float], None) for field in WaterQualityData.__fields__],
+    frozen=True,
+)
+sample_decoder = msgspec.json.Decoder(WaterQualitySample)
+
+
 class EvaluationResponse(BaseModel):
     """
     Pydantic model for the response data.
@@ -40,8 +83,90 @@ class EvaluationResponse(BaseModel):
     graph: str
 
 
-@app.post("/evaluate", response_model=EvaluationResponse)
-async def evaluate_water_quality(data: WaterQualityData):
+class BatchRequest(BaseModel):
+    """
+    Pydantic model for a batch of samples to evaluate together.
+    """
+
+    samples: conlist(WaterQualityData, max_items=MAX_BATCH_SAMPLES)
+
+
+class BatchEvaluationResponse(BaseModel):
+    """
+    Pydantic model for the response data of one sample in a batch.
+    """
+
+    quality_score: float
+    report: str
+
+
+def to_processed_data(data):
+    """
+    Converts a request model into the parameter dictionary expected by
+    WaterQualityEvaluator. Missing parameters map to None.
+    """
+    return {
+        parameter: getattr(data, field) for field, parameter in API_TO_INTERNAL.items()
+    }
+
+
+@app.on_event("startup")
+async def warm_up():
+    """
+    Compiles the rating kernels and renders one chart before serving
+    traffic, so the first request does not pay for compiling, loading fonts
+    and rendering the parameter labels. The parallel batch kernel is not
+    warmed up: /evaluate_batch is capped well below _PARALLEL_MIN_ROWS, and
+    this hook may run outside the main thread.
+    """
+    compile_kernels()
+    quality_model.plot_parameter_contributions(dict.fromkeys(PARAMETERS, 0.0), 0.0)
+
+
+# Full evaluations are cached here, at the API layer, rather than inside the
+# evaluator. The cache holds at most 256 entries; each holds a base64 PNG of
+# ~46 KB, so it stays around 12 MB per worker process.
+@lru_cache(maxsize=256)
+def evaluate_cached(values):
+    """
+    Computes the quality score, report and graph for a tuple of parameter
+    values in API_TO_INTERNAL order. Results are cached by the exact input
+    values; call evaluate_cached.cache_clear() if quality_model changes.
+    """
+    processed_data = dict(zip(PARAMETERS, values))
+
+    # Rate every parameter once and share the ratings below
+    vector = np.full(len(quality_model.parameters), np.nan)
+    vector[COLUMNS] = values
+    qi = quality_model.rate_values(vector)
+
+    # Calculate quality score
+    quality_score = quality_model.calculate_overall_quality(processed_data, qi)
+
+    # Generate report and the contributions to plot in one pass
+    report, contributions = quality_model.build_report_and_plot_data(
+        processed_data, quality_score, qi
+    )
+
+    # # Calculate parameter contributions
+    parameter_contributions = quality_model.plot_parameter_contributions(
+        processed_data, quality_score, contributions=contributions
+    )
+
+    return quality_score, report, parameter_contributions
+
+
+@app.post(
+    "/evaluate",
+    response_model=EvaluationResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": WaterQualityData.schema()}},
+            "required": True,
+        }
+    },
+)
+async def evaluate_water_quality(request: Request):
     """
     Evaluates water quality based on the provided data.
 
@@ -71,55 +196,93 @@ async def evaluate_water_quality(data: WaterQualityData):
     - `report`: A detailed text report of the water quality analysis.
     - `parameter_contributions`: A dictionary showing the contribution of each parameter to the overall score.
     """
-    input_data = data.dict(exclude_none=True)
-
-    processed_data = {
-        "Temperature": input_data.get("Temperature"),
-        "pH": input_data.get("pH"),
-        "Turbidity": input_data.get("Turbidity"),
-        "Dissolved Oxygen": input_data.get("DissolvedOxygen"),
-        "Conductivity": input_data.get("Conductivity"),
-        "Total Dissolved Solids": input_data.get("TotalDissolvedSolids"),
-        "Nitrate": input_data.get("Nitrate"),
-        "Phosphate": input_data.get("Phosphate"),
-        "Total Coliforms": input_data.get("TotalColiforms"),
-        "E. coli": input_data.get("Ecoli"),
-        "BOD": input_data.get("BOD"),
-        "COD": input_data.get("COD"),
-        "Hardness": input_data.get("Hardness"),
-        "Alkalinity": input_data.get("Alkalinity"),
-        "Iron": input_data.get("Iron"),
-    }
+    try:
+        data = sample_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    processed_data = to_processed_data(data)
 
     try:
         quality_model.validate_data(processed_data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    # Calculate quality score
-    quality_score = quality_model.calculate_overall_quality(processed_data)
+    # Identical inputs are served from the cache; misses are computed (and
+    # the graph rendered) off the event loop.
+    quality_score, report, parameter_contributions = await run_in_threadpool(
+        evaluate_cached, tuple(processed_data.values())
+    )
 
-    # Generate report
-    report = quality_model.generate_report(processed_data, quality_score)
+    # Returning a response directly skips FastAPI re-validating the plain
+    # dict against EvaluationResponse; response_model still documents it.
+    return ORJSONResponse(
+        {
+            "quality_score": quality_score,
+            "report": report,
+            "graph": parameter_contributions,
+        }
+    )
 
-    # # Calculate parameter contributions
-    parameter_contributions = quality_model.plot_parameter_contributions(
-        processed_data, quality_score
+
+@app.post("/evaluate_batch", response_model=List[BatchEvaluationResponse])
+def evaluate_water_quality_batch(batch: BatchRequest):
+    """
+    Evaluates several water samples at once.
+
+    **Input:**
+
+    A JSON object with a `samples` list, each item taking the same parameters
+    as `/evaluate`.
+
+    **Output:**
+
+    A list with, for each sample in order:
+    - `quality_score`: The overall water quality score (0-100).
+    - `report`: A detailed text report of the water quality analysis.
+
+    At most 1000 samples are accepted per request. All samples are rated in
+    one vectorized pass, in a worker thread rather than on the event loop.
+    No graphs are rendered.
+    """
+    processed_samples = [to_processed_data(data) for data in batch.samples]
+
+    for i, processed_data in enumerate(processed_samples):
+        try:
+            quality_model.validate_data(processed_data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Sample {i}: {e}")
+
+    scores, qi = quality_model.rate_batch(processed_samples)
+    reports = quality_model.generate_reports(processed_samples, scores, qi)
+
+    return ORJSONResponse(
+        [
+            {"quality_score": float(score), "report": report}
+            for score, report in zip(scores, reports)
+        ]
     )
 
-    return {
-        "quality_score": quality_score,
-        "report": report,
-        "graph": parameter_contributions,
-    }
 
+class ImmutableStaticFiles(StaticFiles):
+    """
+    StaticFiles for the built client assets, marked as immutable. Their file
+    names carry a content hash, so a new build is always fetched under a new
+    URL.
+    """
 
-@app.get("/")
-@app.get("/index.html")
-async def read_index():
-    return FileResponse("client/dist/index.html")
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
 
 
-@app.get("/assets/index.js")
-async def read_js():
-    return FileResponse("client/dist/assets/index.js")
+# Serve the client build with ETag/Last-Modified so repeat requests can be
+# answered with 304. index.html is routed at / and /index.html only, instead
+# of mounting the build at /, so that API paths with a trailing slash
+# (POST /evaluate/) are still redirected to their route rather than answered
+# by StaticFiles.
+app.mount("/assets", ImmutableStaticFiles(directory="client/dist/assets", check_dir=False), name="assets")
+client_files = StaticFiles(directory="client/dist", html=True, check_dir=False)
+app.add_route("/", client_files, include_in_schema=False)
+app.add_route("/index.html", client_files, include_in_schema=False)
@@ -0,0 +1,130 @@
+"""
+Tests of the API routes and static client routing in main.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import water_quality_model
+
+SAMPLE = {
+    "Temperature": 18,
+    "pH": 7.2,
+    "Turbidity": 0.8,
+    "DissolvedOxygen": 8.5,
+    "Conductivity": 250,
+    "TotalDissolvedSolids": 300,
+    "Nitrate": 2.5,
+    "Phosphate": 0.04,
+    "TotalColiforms": 0,
+    "Ecoli": 0,
+    "BOD": 1.5,
+    "COD": 8,
+    "Hardness": 140,
+    "Alkalinity": 110,
+    "Iron": 0.1,
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def client_dist(tmp_path, monkeypatch):
+    """
+    A client build in a temporary working directory.
+    """
+    assets = tmp_path / "client" / "dist" / "assets"
+    assets.mkdir(parents=True)
+    (assets.parent / "index.html").write_text("<!doctype html><title>Water Quality Model</title>")
+    (assets / "index-3f2a9c1b.js").write_text("console.log('client');")
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.mark.parametrize("path", ["/", "/index.html"])
+def test_index(client, client_dist, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert "Water Quality Model" in response.text
+    assert "immutable" not in response.headers.get("cache-control", "")
+    assert client.get(path, headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_hashed_asset(client, client_dist):
+    response = client.get("/assets/index-3f2a9c1b.js")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert client.get("/assets/index-0000000.js").status_code == 404
+
+
+@pytest.mark.parametrize("path", ["/evaluate", "/evaluate/"])
+def test_evaluate(client, client_dist, path):
+    response = client.post(path, json=SAMPLE)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["quality_score"] == pytest.approx(
+        main.quality_model.calculate_overall_quality(main.to_processed_data(main.WaterQualityData(**SAMPLE)))
+    )
+    assert body["report"].startswith("Overall Quality Interpretation: ")
+    assert body["graph"]
+
+
+@pytest.mark.parametrize("body", [b"{", b"[]", b'{"pH": "7"}', b'{"pH": true}', b'{"pH": 1e400}'])
+def test_evaluate_malformed(client, body):
+    response = client.post("/evaluate", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+    assert response.json()["detail"]
+
+
+def test_evaluate_missing_value(client):
+    response = client.post("/evaluate", json={**SAMPLE, "pH": None})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "No value found for parameter 'pH'."}
+    sample = {field: value for field, value in SAMPLE.items() if field != "Iron"}
+    assert client.post("/evaluate", json=sample).json() == {"detail": "No value found for parameter 'Iron'."}
+
+
+def test_evaluate_unknown_field(client):
+    response = client.post("/evaluate", json={**SAMPLE, "Salinity": 0.5})
+    assert response.status_code == 200
+    assert response.json() == client.post("/evaluate", json=SAMPLE).json()
+
+
+def test_evaluate_cache(client):
+    main.evaluate_cached.cache_clear()
+    first = client.post("/evaluate", json=SAMPLE).json()
+    assert client.post("/evaluate", json=SAMPLE).json() == first
+    info = main.evaluate_cached.cache_info()
+    assert (info.hits, info.misses, info.currsize, info.maxsize) == (1, 1, 1, 256)
+    client.post("/evaluate", json={**SAMPLE, "pH": 8.0})
+    assert main.evaluate_cached.cache_info().currsize == 2
+
+
+def test_evaluate_batch(client):
+    samples = [SAMPLE, {**SAMPLE, "pH": 9.5, "Turbidity": 7}]
+    response = client.post("/evaluate_batch", json={"samples": samples})
+    assert response.status_code == 200
+    assert len(response.json()) == len(samples)
+    for result, sample in zip(response.json(), samples):
+        single = client.post("/evaluate", json=sample).json()
+        assert result == {"quality_score": pytest.approx(single["quality_score"]), "report": single["report"]}
+    assert client.post("/evaluate_batch", json={"samples": []}).json() == []
+
+
+def test_evaluate_batch_invalid_sample(client):
+    response = client.post("/evaluate_batch", json={"samples": [SAMPLE, {**SAMPLE, "Nitrate": None}]})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Sample 1: No value found for parameter 'Nitrate'."}
+
+
+def test_evaluate_batch_size_limit(client):
+    response = client.post("/evaluate_batch", json={"samples": [SAMPLE] * main.MAX_BATCH_SAMPLES})
+    assert response.status_code == 200
+    assert len(response.json()) == main.MAX_BATCH_SAMPLES
+    response = client.post("/evaluate_batch", json={"samples": [SAMPLE] * (main.MAX_BATCH_SAMPLES + 1)})
+    assert response.status_code == 422
+    # The API never needs the parallel batch kernel, which warm_up skips
+    assert main.MAX_BATCH_SAMPLES < water_quality_model._PARALLEL_MIN_ROWS
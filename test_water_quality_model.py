@@ -0,0 +1,454 @@
+"""
+Regression tests for the rating and report logic of water_quality_model.
+
+The expected values come from the original per-parameter formulas and
+interpretation rules, so the Numba kernels, the NumPy fallback, the batch
+path and the threshold tables are all checked against the same reference at
+every boundary.
+"""
+import base64
+import copy
+import io
+import math
+import os
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import water_quality_model
+from water_quality_model import WaterQualityEvaluator, _is_missing
+
+
+def below(value):
+    return math.nextafter(value, -math.inf)
+
+
+def above(value):
+    return math.nextafter(value, math.inf)
+
+
+def reference_rating(parameter, value):
+    """
+    The original scalar Qi formula.
+    """
+    rating = WaterQualityEvaluator.default_quality_ratings[parameter]
+    ideal, good_low, good_high, poor_low, poor_high = (
+        rating["ideal"], rating["good_low"], rating["good_high"], rating["poor_low"], rating["poor_high"]
+    )
+
+    if parameter in WaterQualityEvaluator.LOWER_IS_BETTER:
+        if value <= ideal:
+            qi = 100
+        elif ideal < value <= good_high:
+            qi = 100 - (value - ideal) / (good_high - ideal) * 50
+        elif good_high < value <= poor_high:
+            qi = 50 - (value - good_high) / (poor_high - good_high) * 50
+        else:
+            qi = 0
+    else:
+        if good_low <= value <= good_high:
+            if value <= ideal:
+                qi = 50 + (value - good_low) / (ideal - good_low if ideal > good_low else 1) * 50
+            else:
+                qi = 50 + (good_high - value) / (good_high - ideal if good_high > ideal else 1) * 50
+        elif poor_low <= value < good_low:
+            qi = (value - poor_low) / (good_low - poor_low if good_low > poor_low else 1) * 50
+        elif good_high < value <= poor_high:
+            qi = (poor_high - value) / (poor_high - good_high if poor_high > good_high else 1) * 50
+        else:
+            qi = 0
+    return max(0, min(100, qi))
+
+
+# The original interpretation rules: each parameter's comments (by prefix)
+# from the lowest to the highest bucket, and the bucket boundaries. A strict
+# boundary ("value < x") puts x itself in the upper bucket.
+COMMENT_RULES = {
+    "pH": (["pH is acidic", "pH is optimal", "pH is alkaline"], [(6.5, True), (8.5, False)]),
+    "Dissolved Oxygen": (
+        ["Dissolved oxygen levels are critically low", "Dissolved oxygen levels are moderate",
+         "Dissolved oxygen levels are high"],
+        [(5, True), (7, False)],
+    ),
+    "Temperature": (
+        ["Temperature is low", "Temperature is optimal", "Temperature is high"], [(15, True), (25, False)]
+    ),
+    "Turbidity": (
+        ["Turbidity is very low", "Turbidity is low", "Turbidity is moderate", "Turbidity is high"],
+        [(1, False), (5, False), (50, False)],
+    ),
+    "Conductivity": (
+        ["Conductivity is very low", "Conductivity is within", "Conductivity is elevated",
+         "Conductivity is very high"],
+        [(100, False), (500, False), (1500, False)],
+    ),
+    "Total Dissolved Solids": (
+        ["TDS levels are very low", "TDS levels are acceptable", "TDS levels are moderately high",
+         "TDS levels are high"],
+        [(100, False), (500, False), (1000, False)],
+    ),
+    "Nitrate": (
+        ["Nitrate levels are very low", "Nitrate levels are within", "Nitrate levels are elevated",
+         "Nitrate levels are high"],
+        [(1, False), (5, False), (10, False)],
+    ),
+    "Phosphate": (
+        ["Phosphate levels are very low", "Phosphate levels are within", "Phosphate levels are elevated",
+         "Phosphate levels are high"],
+        [(0.02, False), (0.1, False), (0.5, False)],
+    ),
+    "Total Coliforms": (
+        ["Total coliforms are not detected", "Low levels of total coliforms", "High levels of total coliforms"],
+        [(0, False), (10, False)],
+    ),
+    "E. coli": (["E. coli is not detected", "E. coli is detected"], [(0, False)]),
+    "BOD": (
+        ["BOD is very low", "BOD is low", "BOD is moderate", "BOD is high"], [(1, False), (3, False), (8, False)]
+    ),
+    "COD": (
+        ["COD is very low", "COD is low", "COD is moderate", "COD is high"], [(1, False), (5, False), (20, False)]
+    ),
+    "Hardness": (
+        ["Water is soft", "Water is moderately hard", "Water is hard", "Water is very hard"],
+        [(60, False), (120, False), (180, False)],
+    ),
+    "Alkalinity": (
+        ["Alkalinity is low", "Alkalinity is within", "Alkalinity is slightly elevated", "Alkalinity is high"],
+        [(20, True), (100, False), (200, False)],
+    ),
+    "Iron": (
+        ["Iron levels are very low", "Iron levels are low", "Iron levels are moderate", "Iron levels are high"],
+        [(0.1, False), (0.3, False), (1.0, False)],
+    ),
+}
+
+
+def comment_cases():
+    """
+    (parameter, value, expected comment prefix) at and around every boundary.
+    Coliform counts are never negative, so their lowest bucket is only
+    checked at the boundary itself.
+    """
+    cases = []
+    for parameter, (comments, boundaries) in COMMENT_RULES.items():
+        for bucket, (threshold, strict) in enumerate(boundaries):
+            if threshold > 0 or parameter not in ("Total Coliforms", "E. coli"):
+                cases.append((parameter, below(threshold), comments[bucket]))
+            cases.append((parameter, threshold, comments[bucket + strict]))
+            cases.append((parameter, above(threshold), comments[bucket + 1]))
+    return cases
+
+
+def rating_cases():
+    """
+    (parameter, value) at and around every rating knot and comment boundary.
+    """
+    cases = []
+    for parameter, rating in WaterQualityEvaluator.default_quality_ratings.items():
+        knots = {0, rating["ideal"], rating["good_low"], rating["good_high"], rating["poor_low"], rating["poor_high"]}
+        knots.update(threshold for threshold, strict in COMMENT_RULES[parameter][1])
+        for knot in sorted(knots):
+            cases.extend((parameter, value) for value in (below(knot), knot, above(knot)))
+    return cases
+
+
+SAMPLE = {
+    "Temperature": 18,
+    "pH": 7.2,
+    "Turbidity": 0.8,
+    "Dissolved Oxygen": 8.5,
+    "Conductivity": 250,
+    "Total Dissolved Solids": 300,
+    "Nitrate": 2.5,
+    "Phosphate": 0.04,
+    "Total Coliforms": 0,
+    "E. coli": 0,
+    "BOD": 1.5,
+    "COD": 8,
+    "Hardness": 140,
+    "Alkalinity": 110,
+    "Iron": 0.1,
+}
+
+# A batch mixing complete samples, missing parameters and the ways a
+# missing value can be written in a record
+BATCH = [
+    SAMPLE,
+    {**SAMPLE, "pH": 9.5, "Iron": 0.45},
+    {parameter: value for parameter, value in SAMPLE.items() if parameter != "Nitrate"},
+    {**SAMPLE, "Nitrate": None},
+    {**SAMPLE, "Nitrate": math.nan, "BOD": None},
+    {"pH": 6.0, "Turbidity": 12},
+    {},
+]
+
+RATING_CASES = rating_cases()
+COMMENT_CASES = comment_cases()
+
+needs_numba = pytest.mark.skipif(water_quality_model.njit is None, reason="Numba is not installed")
+
+
+@pytest.fixture(params=[
+    pytest.param("numba", marks=needs_numba),
+    pytest.param("numba-parallel", marks=needs_numba),
+    "numpy",
+])
+def evaluator(request, monkeypatch):
+    """
+    A fresh evaluator rating through each of the kernel paths.
+    """
+    if request.param == "numba-parallel":
+        monkeypatch.setattr(water_quality_model, "_PARALLEL_MIN_ROWS", 0)
+    elif request.param == "numpy":
+        monkeypatch.setattr(water_quality_model, "njit", None)
+    return WaterQualityEvaluator()
+
+
+def interpretation(report, parameter):
+    section = report.split(f"\n{parameter}:\n", 1)[1]
+    return section.split("Interpretation: ", 1)[1].split("\n", 1)[0]
+
+
+@pytest.mark.parametrize("parameter, value", RATING_CASES)
+def test_scalar_rating(evaluator, parameter, value):
+    assert evaluator.calculate_quality_rating(parameter, value) == pytest.approx(
+        reference_rating(parameter, value), abs=1e-9
+    )
+
+
+def test_rate(evaluator):
+    for parameter, value in RATING_CASES:
+        qi = evaluator.rate({parameter: value})
+        assert qi[evaluator.parameters.index(parameter)] == pytest.approx(reference_rating(parameter, value), abs=1e-9)
+
+
+def test_rate_batch(evaluator):
+    records = [{parameter: value} for parameter, value in RATING_CASES]
+    scores, qi = evaluator.rate_batch(records)
+    for row, (parameter, value) in enumerate(RATING_CASES):
+        expected = reference_rating(parameter, value)
+        assert qi[row, evaluator.parameters.index(parameter)] == pytest.approx(expected, abs=1e-9)
+        assert scores[row] == pytest.approx(expected * evaluator.weights[parameter], abs=1e-9)
+
+
+def test_overall_score(evaluator):
+    data = {parameter: value for parameter, value in RATING_CASES[::7]}
+    expected = sum(reference_rating(parameter, value) * evaluator.weights[parameter] for parameter, value in data.items())
+    assert evaluator.calculate_overall_quality(data) == pytest.approx(expected, abs=1e-9)
+    assert evaluator.evaluate(data).score == pytest.approx(expected, abs=1e-9)
+
+
+def present(data):
+    return {parameter: value for parameter, value in data.items() if not _is_missing(value)}
+
+
+def test_evaluate_batch(evaluator):
+    scores = evaluator.evaluate_batch(BATCH)
+    assert scores.shape == (len(BATCH),)
+    for score, data in zip(scores, BATCH):
+        assert score == pytest.approx(evaluator.calculate_overall_quality(present(data)), abs=1e-9)
+    assert evaluator.evaluate_batch([]).shape == (0,)
+
+
+def test_evaluate_batch_dataframe(evaluator):
+    pd = pytest.importorskip("pandas")
+    frame = pd.DataFrame(BATCH)
+    frame["Station"] = "upstream"
+    expected_scores, expected_qi = evaluator.rate_batch(BATCH)
+    scores, qi = evaluator.rate_batch(frame)
+    assert scores == pytest.approx(expected_scores, abs=1e-12)
+    assert qi == pytest.approx(expected_qi, abs=1e-12)
+    assert evaluator.evaluate_batch(frame[["pH"]]) == pytest.approx(
+        evaluator.evaluate_batch([{"pH": value} for value in frame["pH"]]), abs=1e-12
+    )
+
+
+@pytest.mark.parametrize("missing", ["NA", "NaT"])
+def test_evaluate_batch_pandas_missing_values(missing):
+    pd = pytest.importorskip("pandas")
+    evaluator = water_quality_model.get_default_evaluator()
+    value = getattr(pd, missing)
+    records = [{**SAMPLE, "Nitrate": value}, {"pH": value, "Iron": 0.2}]
+    expected = evaluator.evaluate_batch([present(data) for data in records])
+    assert evaluator.evaluate_batch(records) == pytest.approx(expected, abs=1e-12)
+    frame = pd.DataFrame(records, dtype=object)
+    assert evaluator.evaluate_batch(frame) == pytest.approx(expected, abs=1e-12)
+    if missing == "NA":
+        frame = pd.DataFrame(records).astype({"Nitrate": "Float64", "pH": "Float64"})
+        assert evaluator.evaluate_batch(frame) == pytest.approx(expected, abs=1e-12)
+
+
+def test_generate_reports_missing_values():
+    evaluator = water_quality_model.get_default_evaluator()
+    scores, qi = evaluator.rate_batch(BATCH)
+    reports = evaluator.generate_reports(BATCH, scores, qi)
+    for report, data, score in zip(reports, BATCH, scores):
+        assert report == evaluator.generate_report(present(data), score)
+    assert "\nNitrate:\n" not in reports[3]
+    assert "\nBOD:\n" not in reports[4]
+
+
+@pytest.mark.parametrize("missing", ["None", "NaN", "NA"])
+def test_generate_reports_dataframe(missing):
+    pd = pytest.importorskip("pandas")
+    evaluator = water_quality_model.get_default_evaluator()
+    value = {"None": None, "NaN": math.nan, "NA": pd.NA}[missing]
+    records = [
+        {parameter: value if _is_missing(cell) else float(cell) for parameter, cell in data.items()}
+        for data in BATCH
+    ]
+    scores, qi = evaluator.rate_batch(records)
+    expected = evaluator.generate_reports(records, scores, qi)
+    frame = pd.DataFrame(records, dtype=object)
+    assert evaluator.generate_reports(frame, scores, qi) == expected
+    assert evaluator.generate_reports(frame.astype("Float64"), scores, qi) == expected
+
+
+@pytest.mark.parametrize("shape", [(14,), (16,), (3, 14), (3, 16), ()])
+def test_rate_values_shape(evaluator, shape):
+    with pytest.raises(ValueError, match="values per sample"):
+        evaluator.rate_values(np.zeros(shape))
+
+
+@pytest.mark.parametrize("parameter, value, expected", COMMENT_CASES)
+def test_report_comment(parameter, value, expected):
+    evaluator = water_quality_model.get_default_evaluator()
+    data = {parameter: value}
+    report = evaluator.generate_report(data, evaluator.calculate_overall_quality(data))
+    assert interpretation(report, parameter).startswith(expected)
+
+
+def test_batch_report_comments():
+    evaluator = water_quality_model.get_default_evaluator()
+    records = [{parameter: value} for parameter, value, expected in COMMENT_CASES]
+    scores, qi = evaluator.rate_batch(records)
+    reports = evaluator.generate_reports(records, scores, qi)
+    for report, data, score, (parameter, value, expected) in zip(reports, records, scores, COMMENT_CASES):
+        assert interpretation(report, parameter).startswith(expected)
+        assert report == evaluator.generate_report(data, score)
+
+
+@pytest.mark.parametrize("score, expected", [
+    (below(25), "Very poor"),
+    (25, "Poor"),
+    (below(50), "Poor"),
+    (50, "Fair"),
+    (below(70), "Fair"),
+    (70, "Good"),
+    (below(90), "Good"),
+    (90, "Excellent"),
+    (100, "Excellent"),
+])
+def test_overall_comment(score, expected):
+    report = water_quality_model.get_default_evaluator().generate_report({}, score)
+    assert report.startswith(f"Overall Quality Interpretation: {expected} water quality.")
+
+
+def test_validate_data_accepts():
+    evaluator = water_quality_model.get_default_evaluator()
+    evaluator.validate_data(SAMPLE)
+    evaluator.validate_data({})
+    evaluator.validate_data({"pH": np.float64(7.1), "Iron": 0, "BOD": 10**300})
+
+
+@pytest.mark.parametrize("data, message", [
+    ({**SAMPLE, "Salinity": 0.5}, "Warning: Unknown parameter 'Salinity' found in data."),
+    ({**SAMPLE, "pH": None}, "No value found for parameter 'pH'."),
+    ({**SAMPLE, "pH": "7"}, "Non-numeric value '7' found for parameter 'pH'."),
+    ({**SAMPLE, "pH": math.nan}, "Non-finite value 'nan' found for parameter 'pH'."),
+    ({**SAMPLE, "Iron": math.inf}, "Non-finite value 'inf' found for parameter 'Iron'."),
+    ({**SAMPLE, "Iron": -math.inf}, "Non-finite value '-inf' found for parameter 'Iron'."),
+    ({**SAMPLE, "COD": 10**400}, f"Non-finite value '{10**400}' found for parameter 'COD'."),
+    ({"pH": None, "Iron": "high"}, "No value found for parameter 'pH'."),
+])
+def test_validate_data_rejects(data, message):
+    with pytest.raises(ValueError) as error:
+        water_quality_model.get_default_evaluator().validate_data(data)
+    assert str(error.value) == message
+
+
+def test_pickle_default_evaluator():
+    evaluator = WaterQualityEvaluator()
+    evaluator.calculate_quality_rating("pH", 7.5)
+    clone = pickle.loads(pickle.dumps(evaluator))
+    assert clone.weights is WaterQualityEvaluator.default_weights
+    assert clone.quality_ratings is WaterQualityEvaluator.default_quality_ratings
+    assert clone._cached_rating.cache_info().currsize == 0
+    assert clone.calculate_quality_rating("pH", 7.5) == evaluator.calculate_quality_rating("pH", 7.5)
+    assert clone.evaluate(SAMPLE).score == evaluator.evaluate(SAMPLE).score
+    assert copy.deepcopy(evaluator).evaluate(SAMPLE).score == evaluator.evaluate(SAMPLE).score
+
+
+def test_pickle_custom_evaluator():
+    weights = {"pH": 0.5, "Iron": 0.5}
+    quality_ratings = {**WaterQualityEvaluator.default_quality_ratings, "Iron": {
+        "ideal": 0, "good_low": 0, "good_high": 0.2, "poor_low": 0.2, "poor_high": 1, "unit": "mg/L",
+    }}
+    evaluator = WaterQualityEvaluator(weights, quality_ratings)
+    clone = pickle.loads(pickle.dumps(evaluator))
+    assert clone.weights == weights
+    assert clone.quality_ratings == quality_ratings
+    data = {"pH": 8.0, "Iron": 0.3}
+    assert clone.calculate_overall_quality(data) == evaluator.calculate_overall_quality(data)
+    assert clone.calculate_overall_quality(data) != WaterQualityEvaluator().calculate_overall_quality(data)
+
+
+def test_default_tables_read_only():
+    with pytest.raises(TypeError):
+        WaterQualityEvaluator.default_weights["pH"] = 0.5
+    with pytest.raises(TypeError):
+        WaterQualityEvaluator.default_quality_ratings["pH"] = {}
+    with pytest.raises(TypeError):
+        WaterQualityEvaluator.default_quality_ratings["pH"]["ideal"] = 8.0
+    evaluator = WaterQualityEvaluator(dict(WaterQualityEvaluator.default_weights))
+    assert evaluator.quality_ratings is WaterQualityEvaluator.default_quality_ratings
+    assert evaluator.evaluate(SAMPLE).score == pytest.approx(WaterQualityEvaluator().evaluate(SAMPLE).score)
+
+
+def decode_chart(chart):
+    return Image.open(io.BytesIO(base64.b64decode(chart)))
+
+
+def test_plot_pillow():
+    evaluator = water_quality_model.get_default_evaluator()
+    result = evaluator.evaluate(SAMPLE)
+    chart = evaluator.plot_parameter_contributions(SAMPLE, result.score)
+    image = decode_chart(chart)
+    assert (image.format, image.size) == ("PNG", water_quality_model.CHART_SIZE)
+    contributions = evaluator.build_report_and_plot_data(SAMPLE, result.score)[1]
+    assert evaluator.plot_parameter_contributions(SAMPLE, result.score, result=result) == chart
+    assert evaluator.plot_parameter_contributions(SAMPLE, result.score, contributions=contributions) == chart
+    assert evaluator.plot_parameter_contributions({**SAMPLE, "pH": 9.5}, result.score) != chart
+    assert decode_chart(evaluator.plot_parameter_contributions({}, 0)).size == water_quality_model.CHART_SIZE
+
+
+def test_plot_unknown_engine():
+    with pytest.raises(ValueError, match="Unknown plotting engine 'svg'"):
+        water_quality_model.get_default_evaluator().plot_parameter_contributions(SAMPLE, 80, engine="svg")
+
+
+def test_plot_matplotlib():
+    pytest.importorskip("matplotlib")
+    evaluator = water_quality_model.get_default_evaluator()
+    score = evaluator.evaluate(SAMPLE).score
+    chart = evaluator.plot_parameter_contributions(SAMPLE, score, engine="matplotlib")
+    image = decode_chart(chart)
+    assert (image.format, image.size) == ("PNG", water_quality_model.CHART_SIZE)
+    # The thread's figure is reused, so nothing may carry over between charts
+    other = evaluator.plot_parameter_contributions({"pH": 9.5}, 10, engine="matplotlib")
+    assert other != chart
+    assert evaluator.plot_parameter_contributions(SAMPLE, score, engine="matplotlib") == chart
+
+
+def test_matplotlib_imported_lazily():
+    code = (
+        "import sys, water_quality_model\n"
+        "evaluator = water_quality_model.get_default_evaluator()\n"
+        "evaluator.plot_parameter_contributions({'pH': 7.0}, 50)\n"
+        "assert 'matplotlib' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
@@ -1,6 +1,201 @@
 import io
-import base64
-import matplotlib.pyplot as plt
+import logging
+import math
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+import numpy as np
+from functools import cache, lru_cache
+from types import MappingProxyType
+from typing import NamedTuple
+from PIL import Image, ImageDraw, ImageFont
+
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional; ratings fall back to NumPy
+    njit = None
+    prange = range
+
+try:
+    from pybase64 import b64encode
+except ImportError:  # pybase64 is optional; charts fall back to the stdlib encoder
+    from base64 import b64encode
+
+CHART_SIZE = (1000, 600)
+# left, top, right, bottom
+CHART_MARGINS = (80, 50, 20, 150)
+BAR_COLOR = (31, 119, 180)
+
+logger = logging.getLogger(__name__)
+
+_matplotlib_local = threading.local()
+
+
+def _is_missing(value):
+    """
+    Returns whether a reading is missing: None, NaN, or one of pandas'
+    missing value scalars (pd.NA, pd.NaT), the cells a DataFrame's
+    to_numpy(na_value=np.nan) turns into NaN.
+    """
+    if value is None:
+        return True
+    try:
+        return math.isnan(value)
+    except OverflowError:  # ints too large for a float
+        return False
+    except TypeError:
+        # pandas' missing values only exist once pandas has been imported
+        pandas = sys.modules.get("pandas")
+        return pandas is not None and pandas.isna(value) is True
+
+
+def _below(threshold):
+    """
+    Returns the largest float smaller than threshold, turning a strict
+    "value < threshold" bound into an inclusive one.
+    """
+    return math.nextafter(threshold, -math.inf)
+
+
+
+def _rate_row(values, qi, ideal, gl, gh, pl, ph, lower_better, range_best,
+              inv_gh_m_ideal, inv_ph_m_gh, inv_ideal_m_gl,
+              inv_gh_m_ideal_r, inv_gl_m_pl, inv_ph_m_gh_r):
+    """
+    Scalar loop form of WaterQualityEvaluator._rate_all for one sample,
+    compiled with Numba when it is installed. Writes the ratings into qi.
+    NaN values rate as 0.
+    """
+    for i in range(values.shape[0]):
+        v = values[i]
+        q = 0.0
+        if lower_better[i]:
+            if v <= ideal[i]:
+                q = 100.0
+            elif v <= gh[i]:
+                q = 100.0 - (v - ideal[i]) * inv_gh_m_ideal[i]
+            elif v <= ph[i]:
+                q = 50.0 - (v - gh[i]) * inv_ph_m_gh[i]
+        elif range_best[i]:
+            if gl[i] <= v <= gh[i]:
+                if v <= ideal[i]:
+                    q = 50.0 + (v - gl[i]) * inv_ideal_m_gl[i]
+                else:
+                    q = 50.0 + (gh[i] - v) * inv_gh_m_ideal_r[i]
+            elif pl[i] <= v < gl[i]:
+                q = (v - pl[i]) * inv_gl_m_pl[i]
+            elif gh[i] < v <= ph[i]:
+                q = (ph[i] - v) * inv_ph_m_gh_r[i]
+        qi[i] = min(max(q, 0.0), 100.0)
+
+
+def _rate_kernel(values, *thresholds):
+    """
+    Rates one sample (a 1-D value array).
+    """
+    qi = np.zeros(values.shape[0])
+    _rate_row(values, qi, *thresholds)
+    return qi
+
+
+def _rate_batch_kernel(values, *thresholds):
+    """
+    Rates an (N, P) value matrix, one sample after another.
+    """
+    qi = np.zeros(values.shape)
+    for n in range(values.shape[0]):
+        _rate_row(values[n], qi[n], *thresholds)
+    return qi
+
+
+def _rate_batch_kernel_parallel(values, *thresholds):
+    """
+    Rates an (N, P) value matrix, spreading the samples over all cores.
+    Callers must hold _parallel_lock.
+    """
+    qi = np.zeros(values.shape)
+    for n in prange(values.shape[0]):
+        _rate_row(values[n], qi[n], *thresholds)
+    return qi
+
+
+# fastmath is left off: it assumes no NaNs, and missing values are NaN.
+if njit is not None:
+    _rate_row = njit(cache=True)(_rate_row)
+    _rate_kernel = njit(cache=True)(_rate_kernel)
+    _rate_batch_kernel = njit(cache=True)(_rate_batch_kernel)
+    _rate_batch_kernel_parallel = njit(cache=True, parallel=True)(_rate_batch_kernel_parallel)
+
+# Smaller batches are rated serially: they finish in well under a
+# millisecond, less than it takes to hand the work to Numba's thread pool.
+_PARALLEL_MIN_ROWS = 20_000
+# Numba's parallel kernels are not safe to call from several threads at once
+# on every threading layer: the fallback "workqueue" layer (used when
+# neither TBB nor OpenMP is installed) aborts the process on concurrent
+# calls. Each call already uses all cores, so they are serialized.
+_parallel_lock = threading.Lock()
+
+
+def _matplotlib_axes():
+    """
+    Returns this thread's reusable Matplotlib Agg canvas and axes. Figures
+    are not thread-safe, so each worker thread gets its own. They are
+    created outside pyplot and never registered with it, so they need no
+    closing.
+    """
+    if not hasattr(_matplotlib_local, "axes"):
+        # Imported here so that only the matplotlib engine pays for it
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(10, 6))
+        # Fixed margins that fit the longest rotated parameter name, instead
+        # of running tight_layout on every render
+        fig.subplots_adjust(left=0.07, right=0.98, bottom=0.27, top=0.94)
+        _matplotlib_local.axes = FigureCanvasAgg(fig), fig.subplots()
+    return _matplotlib_local.axes
+
+
+@lru_cache(maxsize=None)
+def _chart_font(size):
+    return ImageFont.load_default(size=size)
+
+
+@lru_cache(maxsize=None)
+def _rotated_label(text, size, angle=45):
+    """
+    Renders text into a rotated grayscale mask. Labels are the same on every
+    chart, so they are rendered once and reused.
+    """
+    font = _chart_font(size)
+    x0, y0, x1, y1 = font.getbbox(text)
+    mask = Image.new("L", (x1 - x0, y1 - y0), 0)
+    ImageDraw.Draw(mask).text((-x0, -y0), text, fill=255, font=font)
+    return mask.rotate(angle, expand=True, resample=Image.BICUBIC)
+
+
+def _tick_step(maximum):
+    """
+    Returns a 1/2/5 x 10^n tick step giving about five ticks up to maximum.
+    """
+    raw = maximum / 5
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 5, 10):
+        if raw <= factor * magnitude:
+            return factor * magnitude
+
+
+class Evaluation(NamedTuple):
+    """
+    Ratings of one sample, as returned by WaterQualityEvaluator.evaluate.
+    Arrays are in the evaluator's canonical parameter order.
+    """
+
+    values: np.ndarray
+    qi: np.ndarray
+    weighted: np.ndarray
+    score: float
+
 
 class WaterQualityEvaluator:
     """
@@ -9,316 +204,535 @@ class WaterQualityEvaluator:
     and generates a detailed report.
     """
 
+    __slots__ = (
+        "weights", "quality_ratings",
+        "_params", "_index", "_ideal", "_gl", "_gh", "_pl", "_ph", "_w",
+        "_lower_better", "_range_best",
+        "_inv_gh_m_ideal", "_inv_ph_m_gh", "_inv_ideal_m_gl",
+        "_inv_gh_m_ideal_r", "_inv_gl_m_pl", "_inv_ph_m_gh_r", "_kernel_args",
+        "_cached_rating", "_units", "_report_info",
+    )
+
+    # Shared by every evaluator built with the default weights and quality
+    # ratings, so they are read-only (including each parameter's rating).
+    default_weights = MappingProxyType({
+        "Temperature": 0.04,
+        "pH": 0.10,
+        "Turbidity": 0.09,
+        "Dissolved Oxygen": 0.10,
+        "Conductivity": 0.06,
+        "Total Dissolved Solids": 0.06,
+        "Nitrate": 0.08,
+        "Phosphate": 0.09,
+        "Total Coliforms": 0.08,
+        "E. coli": 0.08,
+        "BOD": 0.05,
+        "COD": 0.05,
+        "Hardness": 0.05,
+        "Alkalinity": 0.04,
+        "Iron": 0.03
+    })
+
+    # Adjusted quality ratings for better logic
+    default_quality_ratings = {
+        "Temperature": {"ideal": 20, "good_low": 15, "good_high": 20, "poor_low": 20, "poor_high": 25, "unit": "°C"},
+        "pH": {"ideal": 7.0, "good_low": 6.5, "good_high": 8.5, "poor_low": 8.5, "poor_high": 9.0, "unit": ""},
+        "Turbidity": {"ideal": 0, "good_low": 0, "good_high": 1, "poor_low": 1, "poor_high": 5, "unit": "NTU"},
+        "Dissolved Oxygen": {"ideal": 8, "good_low": 6, "good_high": 12, "poor_low": 5, "poor_high": 6, "unit": "mg/L"},
+        "Conductivity": {"ideal": 200, "good_low": 50, "good_high": 1000, "poor_low": 1000, "poor_high": 2500, "unit": "µS/cm"},
+        "Total Dissolved Solids": {"ideal": 250, "good_low": 30, "good_high": 500, "poor_low": 500, "poor_high": 1000, "unit": "mg/L"},
+        "Nitrate": {"ideal": 2, "good_low": 0, "good_high": 5, "poor_low": 5, "poor_high": 10, "unit": "mg/L"},
+        "Phosphate": {"ideal": 0.05, "good_low": 0, "good_high": 0.1, "poor_low": 0.1, "poor_high": 0.5, "unit": "mg/L"},
+        "Total Coliforms": {"ideal": 0, "good_low": 0, "good_high": 0, "poor_low": 0, "poor_high": 10, "unit": "CFU/100mL"},
+        "E. coli": {"ideal": 0, "good_low": 0, "good_high": 0, "poor_low": 0, "poor_high": 1, "unit": "CFU/100mL"},
+        "BOD": {"ideal": 1, "good_low": 0, "good_high": 2, "poor_low": 2, "poor_high": 5, "unit": "mg/L"},
+        "COD": {"ideal": 10, "good_low": 0, "good_high": 20, "poor_low": 20, "poor_high": 50, "unit": "mg/L"},
+        "Hardness": {"ideal": 150, "good_low": 60, "good_high": 300, "poor_low": 300, "poor_high": 500, "unit": "mg/L"},
+        "Alkalinity": {"ideal": 100, "good_low": 20, "good_high": 200, "poor_low": 200, "poor_high": 300, "unit": "mg/L"},
+        "Iron": {"ideal": 0.1, "good_low": 0, "good_high": 0.3, "poor_low": 0.3, "poor_high": 0.5, "unit": "mg/L"},
+    }
+    default_quality_ratings = MappingProxyType({
+        parameter: MappingProxyType(rating) for parameter, rating in default_quality_ratings.items()
+    })
+
+    LOWER_IS_BETTER = ["Turbidity", "Total Coliforms", "E. coli", "BOD", "COD", "Iron", "Phosphate", "Nitrate", "Conductivity", "Total Dissolved Solids"]
+    RANGE_IS_BEST = ["pH", "Dissolved Oxygen", "Temperature", "Hardness", "Alkalinity"]
+
+    # Overall interpretation comments. A score gets the comment at
+    # bisect_right(thresholds, score): each threshold is the inclusive lower
+    # bound of the next comment.
+    _OVERALL_THRESHOLDS = (25, 50, 70, 90)
+    _OVERALL_COMMENTS = (
+        "Very poor water quality. Not suitable for use without extensive treatment.",
+        "Poor water quality. Requires significant treatment before use.",
+        "Fair water quality. May be suitable for some uses but might require treatment for others.",
+        "Good water quality. Generally suitable for most uses.",
+        "Excellent water quality. Suitable for all uses.",
+    )
+
+    # Interpretation comments per parameter. A value gets the comment at
+    # bisect_left(thresholds, value), i.e. the first bucket whose upper bound
+    # it does not exceed; strict bounds ("value < x") use _below(x).
+    _REPORT_TABLE = {
+        "pH": (
+            [_below(6.5), 8.5],
+            [
+                "pH is acidic, which can be corrosive and may affect aquatic life.",
+                "pH is optimal, well-suited for most aquatic life and uses.",
+                "pH is alkaline, which can be unpleasant to taste and may affect aquatic life.",
+            ],
+        ),
+        "Dissolved Oxygen": (
+            [_below(5), 7],
+            [
+                "Dissolved oxygen levels are critically low, severely stressing aquatic life.",
+                "Dissolved oxygen levels are moderate, sufficient for some aquatic life but could be better.",
+                "Dissolved oxygen levels are high, indicating a healthy and well-oxygenated aquatic ecosystem.",
+            ],
+        ),
+        "Temperature": (
+            [_below(15), 25],
+            [
+                "Temperature is low, which can slow down biological processes in aquatic ecosystems.",
+                "Temperature is optimal for a wide range of aquatic organisms.",
+                "Temperature is high, which can reduce dissolved oxygen levels and stress aquatic life.",
+            ],
+        ),
+        "Turbidity": (
+            [1, 5, 50],
+            [
+                "Turbidity is very low, indicating exceptionally clear water.",
+                "Turbidity is low, indicating clear water.",
+                "Turbidity is moderate, which may impact light penetration and visual clarity.",
+                "Turbidity is high, indicating cloudy water with a significant amount of suspended particles.",
+            ],
+        ),
+        "Conductivity": (
+            [100, 500, 1500],
+            [
+                "Conductivity is very low, indicating very pure water with minimal dissolved substances.",
+                "Conductivity is within a normal range for freshwater systems.",
+                "Conductivity is elevated, suggesting a higher concentration of dissolved substances.",
+                "Conductivity is very high, which can be detrimental to aquatic life and indicates significant dissolved solids.",
+            ],
+        ),
+        "Total Dissolved Solids": (
+            [100, 500, 1000],
+            [
+                "TDS levels are very low, indicating high purity.",
+                "TDS levels are acceptable for drinking water.",
+                "TDS levels are moderately high and may affect taste or be noticeable.",
+                "TDS levels are high, potentially making the water unpalatable or unsuitable for certain uses.",
+            ],
+        ),
+        "Nitrate": (
+            [1, 5, 10],
+            [
+                "Nitrate levels are very low and well within safe limits.",
+                "Nitrate levels are within acceptable limits.",
+                "Nitrate levels are elevated and could contribute to eutrophication in sensitive waters.",
+                "Nitrate levels are high, posing a significant risk of eutrophication and potential health concerns.",
+            ],
+        ),
+        "Phosphate": (
+            [0.02, 0.1, 0.5],
+            [
+                "Phosphate levels are very low and well within acceptable limits.",
+                "Phosphate levels are within acceptable limits.",
+                "Phosphate levels are elevated and could contribute to algal blooms.",
+                "Phosphate levels are high, significantly increasing the risk of nuisance algal blooms.",
+            ],
+        ),
+        "Total Coliforms": (
+            [0, 10],
+            [
+                "Total coliforms are not detected, indicating excellent sanitary quality.",
+                "Low levels of total coliforms detected, suggesting a potential for minor contamination.",
+                "High levels of total coliforms, indicating likely fecal contamination and the need for further investigation.",
+            ],
+        ),
+        "E. coli": (
+            [0],
+            [
+                "E. coli is not detected, indicating the water is likely safe from recent fecal contamination.",
+                "E. coli is detected, indicating fecal contamination and a potential risk of waterborne illness. This requires immediate attention.",
+            ],
+        ),
+        "BOD": (
+            [1, 3, 8],
+            [
+                "BOD is very low, indicating excellent water quality with minimal organic pollution.",
+                "BOD is low, indicating good water quality with minimal organic pollution.",
+                "BOD is moderate, suggesting some organic pollution that could impact dissolved oxygen levels.",
+                "BOD is high, indicating significant organic pollution and a potential for oxygen depletion.",
+            ],
+        ),
+        "COD": (
+            [1, 5, 20],
+            [
+                "COD is very low, indicating very clean water with minimal chemical pollutants.",
+                "COD is low, indicating minimal chemical pollutants.",
+                "COD is moderate, suggesting the presence of some chemical pollutants.",
+                "COD is high, indicating significant chemical pollution that may require treatment.",
+            ],
+        ),
+        "Hardness": (
+            [60, 120, 180],
+            [
+                "Water is soft, which is generally good but may lack some minerals.",
+                "Water is moderately hard, generally considered good for consumption.",
+                "Water is hard, which may lead to scale buildup.",
+                "Water is very hard, likely to cause significant scale buildup and may affect soap effectiveness.",
+            ],
+        ),
+        "Alkalinity": (
+            [_below(20), 100, 200],
+            [
+                "Alkalinity is low, making the water susceptible to pH changes.",
+                "Alkalinity is within the optimal range, providing good buffering capacity.",
+                "Alkalinity is slightly elevated but generally acceptable.",
+                "Alkalinity is high, which may be associated with high pH and can affect the taste of water.",
+            ],
+        ),
+        "Iron": (
+            [0.1, 0.3, 1.0],
+            [
+                "Iron levels are very low, unlikely to cause any issues.",
+                "Iron levels are low, with a minimal risk of staining or taste issues.",
+                "Iron levels are moderate and may cause noticeable staining in plumbing fixtures.",
+                "Iron levels are high, likely causing significant staining and a metallic taste.",
+            ],
+        ),
+    }
+
+    # The same thresholds as float arrays, built once for np.searchsorted
+    _REPORT_THRESHOLDS = {
+        parameter: np.array(thresholds, dtype=np.float64)
+        for parameter, (thresholds, comments) in _REPORT_TABLE.items()
+    }
+
     def __init__(self, weights=None, quality_ratings=None):
         """
         Initializes the WaterQualityEvaluator with optional custom weights and
         quality ratings.
         """
-        self.default_weights = {
-            "Temperature": 0.04,
-            "pH": 0.10,
-            "Turbidity": 0.09,
-            "Dissolved Oxygen": 0.10,
-            "Conductivity": 0.06,
-            "Total Dissolved Solids": 0.06,
-            "Nitrate": 0.08,
-            "Phosphate": 0.09,
-            "Total Coliforms": 0.08,
-            "E. coli": 0.08,
-            "BOD": 0.05,
-            "COD": 0.05,
-            "Hardness": 0.05,
-            "Alkalinity": 0.04,
-            "Iron": 0.03
-        }
-
-        # Adjusted quality ratings for better logic
-        self.default_quality_ratings = {
-            "Temperature": {"ideal": 20, "good_low": 15, "good_high": 20, "poor_low": 20, "poor_high": 25, "unit": "°C"},
-            "pH": {"ideal": 7.0, "good_low": 6.5, "good_high": 8.5, "poor_low": 8.5, "poor_high": 9.0, "unit": ""},
-            "Turbidity": {"ideal": 0, "good_low": 0, "good_high": 1, "poor_low": 1, "poor_high": 5, "unit": "NTU"},
-            "Dissolved Oxygen": {"ideal": 8, "good_low": 6, "good_high": 12, "poor_low": 5, "poor_high": 6, "unit": "mg/L"},
-            "Conductivity": {"ideal": 200, "good_low": 50, "good_high": 1000, "poor_low": 1000, "poor_high": 2500, "unit": "µS/cm"},
-            "Total Dissolved Solids": {"ideal": 250, "good_low": 30, "good_high": 500, "poor_low": 500, "poor_high": 1000, "unit": "mg/L"},
-            "Nitrate": {"ideal": 2, "good_low": 0, "good_high": 5, "poor_low": 5, "poor_high": 10, "unit": "mg/L"},
-            "Phosphate": {"ideal": 0.05, "good_low": 0, "good_high": 0.1, "poor_low": 0.1, "poor_high": 0.5, "unit": "mg/L"},
-            "Total Coliforms": {"ideal": 0, "good_low": 0, "good_high": 0, "poor_low": 0, "poor_high": 10, "unit": "CFU/100mL"},
-            "E. coli": {"ideal": 0, "good_low": 0, "good_high": 0, "poor_low": 0, "poor_high": 1, "unit": "CFU/100mL"},
-            "BOD": {"ideal": 1, "good_low": 0, "good_high": 2, "poor_low": 2, "poor_high": 5, "unit": "mg/L"},
-            "COD": {"ideal": 10, "good_low": 0, "good_high": 20, "poor_low": 20, "poor_high": 50, "unit": "mg/L"},
-            "Hardness": {"ideal": 150, "good_low": 60, "good_high": 300, "poor_low": 300, "poor_high": 500, "unit": "mg/L"},
-            "Alkalinity": {"ideal": 100, "good_low": 20, "good_high": 200, "poor_low": 200, "poor_high": 300, "unit": "mg/L"},
-            "Iron": {"ideal": 0.1, "good_low": 0, "good_high": 0.3, "poor_low": 0.3, "poor_high": 0.5, "unit": "mg/L"},
-        }
         self.weights = weights if weights is not None else self.default_weights
         self.quality_ratings = quality_ratings if quality_ratings is not None else self.default_quality_ratings
 
-        if abs(sum(self.weights.values()) - 1) > 1e-6:
+        if weights is not None or quality_ratings is not None:
+            unrated = self.weights.keys() - self.quality_ratings.keys()
+            if unrated:
+                raise ValueError(f"No quality ratings found for weighted parameters {sorted(unrated)}.")
+
+        # Parameter thresholds as float arrays aligned to a canonical parameter
+        # order, so all ratings can be evaluated in a single vectorized pass.
+        self._params = tuple(self.quality_ratings)
+        self._index = {parameter: i for i, parameter in enumerate(self._params)}
+        ratings = [self.quality_ratings[parameter] for parameter in self._params]
+        self._ideal = np.array([r["ideal"] for r in ratings], dtype=np.float64)
+        self._gl = np.array([r["good_low"] for r in ratings], dtype=np.float64)
+        self._gh = np.array([r["good_high"] for r in ratings], dtype=np.float64)
+        self._pl = np.array([r["poor_low"] for r in ratings], dtype=np.float64)
+        self._ph = np.array([r["poor_high"] for r in ratings], dtype=np.float64)
+        self._units = tuple(r["unit"] for r in ratings)
+        # Everything the report needs per weighted parameter, in one lookup
+        self._report_info = {
+            parameter: (self._index[parameter], self._units[self._index[parameter]])
+            + self._REPORT_TABLE.get(parameter, (None, None))
+            for parameter in self.weights
+        }
+        self._w = np.fromiter(
+            (self.weights.get(parameter, 0.0) for parameter in self._params),
+            dtype=np.float64, count=len(self._params),
+        )
+        # The default weights are known to sum to 1
+        if weights is not None and abs(math.fsum(self._w) - 1) > 1e-6:
             raise ValueError("The sum of the weights should be equal to 1")
+        self._lower_better = np.isin(self._params, self.LOWER_IS_BETTER)
+        self._range_best = np.isin(self._params, self.RANGE_IS_BEST)
+
+        # Slopes of the rating segments (50 points per segment), with the
+        # zero-width guards resolved once here instead of on every rating.
+        # The ratings are not a plain np.interp over the knots
+        # [poor_low, good_low, ideal, good_high, poor_high]: several default
+        # ratings have zero-width segments (e.g. ideal == good_high), where
+        # the rating jumps from 100 to 50, or knots out of order
+        # (poor_low > good_low), which np.interp cannot represent.
+        ideal, gl, gh, pl, ph = self._ideal, self._gl, self._gh, self._pl, self._ph
+        self._inv_gh_m_ideal = 50.0 / np.where(gh != ideal, gh - ideal, 1.0)
+        self._inv_ph_m_gh = 50.0 / np.where(ph != gh, ph - gh, 1.0)
+        self._inv_ideal_m_gl = 50.0 / np.where(ideal > gl, ideal - gl, 1.0)
+        self._inv_gh_m_ideal_r = 50.0 / np.where(gh > ideal, gh - ideal, 1.0)
+        self._inv_gl_m_pl = 50.0 / np.where(gl > pl, gl - pl, 1.0)
+        self._inv_ph_m_gh_r = 50.0 / np.where(ph > gh, ph - gh, 1.0)
+
+        self._kernel_args = (
+            ideal, gl, gh, pl, ph, self._lower_better, self._range_best,
+            self._inv_gh_m_ideal, self._inv_ph_m_gh, self._inv_ideal_m_gl,
+            self._inv_gh_m_ideal_r, self._inv_gl_m_pl, self._inv_ph_m_gh_r,
+        )
+        # Ratings only depend on the (fixed) thresholds, so repeated scalar
+        # lookups of the same reading are served from a per-instance cache.
+        self._cached_rating = lru_cache(maxsize=4096)(self._rate_scalar)
 
-    def calculate_quality_rating(self, parameter, value):
+    def __reduce__(self):
         """
-        Calculates the quality rating (Qi) for a parameter.
+        Pickles (and copies) the evaluator by its weights and quality
+        ratings only. Unpickling runs __init__ again, which rebuilds the
+        rating arrays and starts a fresh rating cache.
         """
-        rating = self.quality_ratings[parameter]
-        ideal, good_low, good_high, poor_low, poor_high = (
-            rating["ideal"], rating["good_low"], rating["good_high"], rating["poor_low"], rating["poor_high"]
-        )
-
-        if parameter in ["Turbidity", "Total Coliforms", "E. coli", "BOD", "COD", "Iron", "Phosphate", "Nitrate", "Conductivity", "Total Dissolved Solids"]:
-            # Lower is better
-            if value <= ideal:
-                qi = 100
-            elif ideal < value <= good_high:
-                qi = 100 - (value - ideal) / (good_high - ideal) * 50
-            elif good_high < value <= poor_high:
-                qi = 50 - (value - good_high) / (poor_high - good_high) * 50
-            else:
-                qi = 0 # Value outside the defined range
-        elif parameter in ["pH", "Dissolved Oxygen", "Temperature", "Hardness", "Alkalinity"]:
-            # Range is best
-            if good_low <= value <= good_high:
-                if value <= ideal:
-                    qi = 50 + (value - good_low) / (ideal - good_low if ideal > good_low else 1) * 50
-                else:
-                    qi = 50 + (good_high - value) / (good_high - ideal if good_high > ideal else 1) * 50
-            elif poor_low <= value < good_low:
-                qi = (value - poor_low) / (good_low - poor_low if good_low > poor_low else 1) * 50
-            elif good_high < value <= poor_high:
-                qi = (poor_high - value) / (poor_high - good_high if poor_high > good_high else 1) * 50
-            else:
-                qi = 0 # Value outside the defined range
-        else:
-            return 0  # Unknown parameter
-
-        return max(0, min(qi, 100))
+        # The read-only default tables cannot be pickled; None selects them.
+        # Custom tables are copied to plain dicts, since they may have been
+        # built from the defaults' read-only ratings.
+        weights = None if self.weights is self.default_weights else dict(self.weights)
+        quality_ratings = None if self.quality_ratings is self.default_quality_ratings else {
+            parameter: dict(rating) for parameter, rating in self.quality_ratings.items()
+        }
+        return type(self), (weights, quality_ratings)
 
-    def _calculate_quality_rating_temperature(self, value):
-        return self.calculate_quality_rating("Temperature", value)
+    def _to_vector(self, data):
+        """
+        Arranges the values of a data dictionary in the canonical parameter
+        order. Missing parameters are left as NaN.
+        """
+        # None converts to NaN under a float dtype
+        return np.array([data.get(parameter) for parameter in self._params], dtype=np.float64)
 
-    def _calculate_quality_rating_turbidity(self, value):
-        return self.calculate_quality_rating("Turbidity", value)
+    def _rate_all(self, values):
+        """
+        Calculates the quality ratings (Qi) of all parameters at once from a
+        value array in the canonical parameter order. NaN values rate as 0.
+        """
+        v = np.asarray(values, dtype=np.float64)
+        # The kernels index the threshold arrays by column, so check the
+        # row length here rather than rely on NumPy broadcasting
+        if v.shape[-1:] != (len(self._params),):
+            raise ValueError(
+                f"Expected {len(self._params)} values per sample, got array of shape {v.shape}."
+            )
+        if njit is not None:
+            if v.ndim == 1:
+                return _rate_kernel(np.ascontiguousarray(v), *self._kernel_args)
+            if v.ndim == 2:
+                if v.shape[0] < _PARALLEL_MIN_ROWS:
+                    return _rate_batch_kernel(np.ascontiguousarray(v), *self._kernel_args)
+                with _parallel_lock:
+                    return _rate_batch_kernel_parallel(np.ascontiguousarray(v), *self._kernel_args)
+
+        ideal, gl, gh, pl, ph = self._ideal, self._gl, self._gh, self._pl, self._ph
+
+        # Lower is better
+        qi_low = np.where(
+            v <= ideal, 100.0,
+            np.where(
+                v <= gh, 100.0 - (v - ideal) * self._inv_gh_m_ideal,
+                np.where(v <= ph, 50.0 - (v - gh) * self._inv_ph_m_gh, 0.0),
+            ),
+        )
 
-    def _calculate_quality_rating_conductivity(self, value):
-        return self.calculate_quality_rating("Conductivity", value)
+        # Range is best
+        qi_good = np.where(
+            v <= ideal,
+            50.0 + (v - gl) * self._inv_ideal_m_gl,
+            50.0 + (gh - v) * self._inv_gh_m_ideal_r,
+        )
+        qi_range = np.where(
+            (gl <= v) & (v <= gh), qi_good,
+            np.where(
+                (pl <= v) & (v < gl), (v - pl) * self._inv_gl_m_pl,
+                np.where((gh < v) & (v <= ph), (ph - v) * self._inv_ph_m_gh_r, 0.0),
+            ),
+        )
 
-    def _calculate_quality_rating_tds(self, value):
-        return self.calculate_quality_rating("Total Dissolved Solids", value)
+        qi = np.where(self._lower_better, qi_low, np.where(self._range_best, qi_range, 0.0))
+        return np.clip(qi, 0, 100)
 
-    def _calculate_quality_rating_nitrate(self, value):
-        return self.calculate_quality_rating("Nitrate", value)
+    def rate(self, data):
+        """
+        Calculates the quality ratings (Qi) of all parameters in the data
+        dictionary, in the canonical parameter order. The result can be passed
+        to calculate_overall_quality, generate_report and
+        plot_parameter_contributions to avoid rating the same data again.
+        """
+        return self._rate_all(self._to_vector(data))
 
-    def _calculate_quality_rating_phosphate(self, value):
-        return self.calculate_quality_rating("Phosphate", value)
+    @property
+    def parameters(self):
+        """
+        The canonical parameter order used by the rating arrays.
+        """
+        return self._params
 
-    def _calculate_quality_rating_total_coliforms(self, value):
-        return self.calculate_quality_rating("Total Coliforms", value)
+    def rate_values(self, values):
+        """
+        Calculates the quality ratings (Qi) from an array of values already
+        in the canonical parameter order (see parameters). Missing values
+        should be NaN.
+        """
+        return self._rate_all(values)
 
-    def _calculate_quality_rating_e_coli(self, value):
-        return self.calculate_quality_rating("E. coli", value)
+    def _to_matrix(self, records):
+        """
+        Arranges a list of data dictionaries, or a DataFrame with one column
+        per parameter, as an (N, P) value matrix in the canonical parameter
+        order. Missing parameters and missing values (see _is_missing) are
+        left as NaN.
+        """
+        if hasattr(records, "reindex"):
+            frame = records.reindex(columns=list(self._params))
+            try:
+                return frame.to_numpy(dtype=np.float64, na_value=np.nan)
+            except TypeError:  # pd.NA or pd.NaT in an object column
+                return frame.to_numpy(dtype=object, na_value=np.nan).astype(np.float64)
+        rows = [[data.get(parameter, np.nan) for parameter in self._params] for data in records]
+        try:
+            # None converts to NaN under a float dtype
+            values = np.array(rows, dtype=np.float64)
+        except TypeError:  # pd.NA or pd.NaT in a record
+            values = np.array(
+                [[np.nan if _is_missing(value) else value for value in row] for row in rows],
+                dtype=np.float64,
+            )
+        return values.reshape(-1, len(self._params))
 
-    def _calculate_quality_rating_bod(self, value):
-        return self.calculate_quality_rating("BOD", value)
+    def rate_batch(self, records):
+        """
+        Rates a list of data dictionaries (or a DataFrame) in one vectorized
+        pass. Returns the overall quality scores as an (N,) array and the
+        quality ratings (Qi) as an (N, P) array in the canonical parameter
+        order.
+        """
+        qi = self._rate_all(self._to_matrix(records))
+        return qi @ self._w, qi
 
-    def _calculate_quality_rating_cod(self, value):
-        return self.calculate_quality_rating("COD", value)
+    def evaluate_batch(self, records):
+        """
+        Calculates the overall quality scores of a list of data dictionaries
+        (or a DataFrame) as an (N,) array.
+        """
+        return self.rate_batch(records)[0]
 
-    def _calculate_quality_rating_hardness(self, value):
-        return self.calculate_quality_rating("Hardness", value)
+    def evaluate(self, data):
+        """
+        Validates and rates the data once. The returned Evaluation can be
+        passed as result= to generate_report and plot_parameter_contributions
+        so they reuse the ratings instead of computing them again.
+        """
+        self.validate_data(data)
+        values = self._to_vector(data)
+        qi = self._rate_all(values)
+        weighted = qi * self._w
+        return Evaluation(values, qi, weighted, float(self._w @ qi))
 
-    def _calculate_quality_rating_alkalinity(self, value):
-        return self.calculate_quality_rating("Alkalinity", value)
+    def calculate_quality_rating(self, parameter, value):
+        """
+        Calculates the quality rating (Qi) for a parameter.
+        """
+        return self._cached_rating(parameter, value)
 
-    def _calculate_quality_rating_iron(self, value):
-        return self.calculate_quality_rating("Iron", value)
+    def _rate_scalar(self, parameter, value):
+        """
+        Uncached form of calculate_quality_rating.
+        """
+        values = np.full(len(self._params), np.nan)
+        values[self._index[parameter]] = value
+        return float(self._rate_all(values)[self._index[parameter]])
 
-    def calculate_overall_quality(self, data):
+    def calculate_overall_quality(self, data, qi=None):
         """
         Calculates the overall water quality score using a weighted arithmetic method.
         """
-        quality_sum = 0
-        for parameter, value in data.items():
-            if parameter not in self.weights:
-                print(f"Warning: Unknown parameter '{parameter}' found in data. Skipping.")
-                continue
-            qi = self.calculate_quality_rating(parameter, value)
-            quality_sum += qi * self.weights[parameter]
+        unknown = data.keys() - self.weights.keys()
+        if unknown:
+            logger.warning("Unknown parameters %s found in data. Skipping.", sorted(unknown))
 
-        return quality_sum
+        if qi is None:
+            qi = self.rate(data)
+        return float(self._w @ qi)
 
-    def generate_report(self, data, quality_score):
+    def _comment_indices(self, values):
+        """
+        Finds the interpretation comment index of each value in a (P,) or
+        (N, P) array in the canonical parameter order, with one
+        np.searchsorted call per parameter. Parameters without a comment
+        table get -1.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        indices = np.full(values.shape, -1, dtype=np.intp)
+        for parameter, thresholds in self._REPORT_THRESHOLDS.items():
+            if parameter in self._index:
+                column = self._index[parameter]
+                indices[..., column] = np.searchsorted(thresholds, values[..., column])
+        return indices
+
+    def generate_reports(self, records, scores, qi):
+        """
+        Generates the reports of a batch of samples (a list of data
+        dictionaries or a DataFrame), using the scores and quality ratings
+        (Qi) returned by rate_batch. Interpretation comments are looked up
+        for the whole batch at once.
+        """
+        values = self._to_matrix(records)
+        comment_indices = self._comment_indices(values)
+        if hasattr(records, "reindex"):
+            records = records.to_dict("records")
+        # Missing values are left out of the reports, with the same
+        # predicate _to_matrix uses, whichever container they came in
+        records = [
+            {parameter: value for parameter, value in data.items() if not _is_missing(value)}
+            for data in records
+        ]
+        return [
+            self.build_report_and_plot_data(data, score, sample_qi, comment_index=sample_indices)[0]
+            for data, score, sample_qi, sample_indices in zip(records, scores, qi, comment_indices)
+        ]
+
+    def generate_report(self, data, quality_score, qi=None, result=None):
         """
         Generates a formatted report of the water quality analysis with additional
         contextual comments.
         """
-        report = ''
+        return self.build_report_and_plot_data(data, quality_score, qi, result)[0]
 
-        # Overall quality interpretation
-        if quality_score >= 90:
-            overall_quality_comment = "Excellent water quality. Suitable for all uses."
-        elif quality_score >= 70:
-            overall_quality_comment = "Good water quality. Generally suitable for most uses."
-        elif quality_score >= 50:
-            overall_quality_comment = "Fair water quality. May be suitable for some uses but might require treatment for others."
-        elif quality_score >= 25:
-            overall_quality_comment = "Poor water quality. Requires significant treatment before use."
-        else:
-            overall_quality_comment = "Very poor water quality. Not suitable for use without extensive treatment."
+    def build_report_and_plot_data(self, data, quality_score, qi=None, result=None, comment_index=None):
+        """
+        Generates the report and the parameter contributions for
+        plot_parameter_contributions in a single pass over the parameters.
+        comment_index optionally gives precomputed comment indices (see
+        _comment_indices) in the canonical parameter order.
+        """
+        if result is not None:
+            qi = result.qi
+        parts = []
+        contributions = {}
 
-        report += f"Overall Quality Interpretation: {overall_quality_comment}\n\n"
+        # Overall quality interpretation
+        overall_quality_comment = self._OVERALL_COMMENTS[bisect_right(self._OVERALL_THRESHOLDS, quality_score)]
 
-        report += f"Parameter Details:\n"
+        parts.append(f"Overall Quality Interpretation: {overall_quality_comment}\n\nParameter Details:\n")
+        qi_all = self.rate(data) if qi is None else qi
+        weighted_all = (qi_all * self._w).tolist()
+        qi_all = qi_all.tolist()
+        report_info = self._report_info
         for parameter, value in data.items():
-            if parameter not in self.weights:
+            info = report_info.get(parameter)
+            if info is None:
                 continue
 
-            unit = self.quality_ratings[parameter]["unit"]
-            qi = self.calculate_quality_rating(parameter, value)
-            weighted_qi = qi * self.weights[parameter]
+            index, unit, thresholds, comments = info
+            qi = qi_all[index]
+            weighted_qi = weighted_all[index]
+            contributions[parameter] = weighted_qi
 
             # Parameter-specific interpretation
-            if parameter == "pH":
-                if value < 6.5:
-                    param_comment = "pH is acidic, which can be corrosive and may affect aquatic life."
-                elif 6.5 <= value <= 8.5:
-                    param_comment = "pH is optimal, well-suited for most aquatic life and uses."
-                elif value > 8.5:
-                    param_comment = "pH is alkaline, which can be unpleasant to taste and may affect aquatic life."
-
-            elif parameter == "Dissolved Oxygen":
-                if value < 5:
-                    param_comment = "Dissolved oxygen levels are critically low, severely stressing aquatic life."
-                elif 5 <= value <= 7:
-                    param_comment = "Dissolved oxygen levels are moderate, sufficient for some aquatic life but could be better."
-                elif value > 7:
-                    param_comment = "Dissolved oxygen levels are high, indicating a healthy and well-oxygenated aquatic ecosystem."
-
-            elif parameter == "Temperature":
-                if value < 15:
-                    param_comment = "Temperature is low, which can slow down biological processes in aquatic ecosystems."
-                elif 15 <= value <= 25:
-                    param_comment = "Temperature is optimal for a wide range of aquatic organisms."
-                elif value > 25:
-                    param_comment = "Temperature is high, which can reduce dissolved oxygen levels and stress aquatic life."
-
-            elif parameter == "Turbidity":
-                if value <= 1:
-                    param_comment = "Turbidity is very low, indicating exceptionally clear water."
-                elif 1 < value <= 5:
-                    param_comment = "Turbidity is low, indicating clear water."
-                elif 5 < value <= 50:
-                    param_comment = "Turbidity is moderate, which may impact light penetration and visual clarity."
-                elif value > 50:
-                    param_comment = "Turbidity is high, indicating cloudy water with a significant amount of suspended particles."
-
-            elif parameter == "Conductivity":
-                if value <= 100:
-                    param_comment = "Conductivity is very low, indicating very pure water with minimal dissolved substances."
-                elif 100 < value <= 500:
-                    param_comment = "Conductivity is within a normal range for freshwater systems."
-                elif 500 < value <= 1500:
-                    param_comment = "Conductivity is elevated, suggesting a higher concentration of dissolved substances."
-                elif value > 1500:
-                    param_comment = "Conductivity is very high, which can be detrimental to aquatic life and indicates significant dissolved solids."
-
-            elif parameter == "Total Dissolved Solids":
-                if value <= 100:
-                    param_comment = "TDS levels are very low, indicating high purity."
-                elif 100 < value <= 500:
-                    param_comment = "TDS levels are acceptable for drinking water."
-                elif 500 < value <= 1000:
-                    param_comment = "TDS levels are moderately high and may affect taste or be noticeable."
-                elif value > 1000:
-                    param_comment = "TDS levels are high, potentially making the water unpalatable or unsuitable for certain uses."
-
-            elif parameter == "Nitrate":
-                if value <= 1:
-                    param_comment = "Nitrate levels are very low and well within safe limits."
-                elif 1 < value <= 5:
-                    param_comment = "Nitrate levels are within acceptable limits."
-                elif 5 < value <= 10:
-                    param_comment = "Nitrate levels are elevated and could contribute to eutrophication in sensitive waters."
-                elif value > 10:
-                    param_comment = "Nitrate levels are high, posing a significant risk of eutrophication and potential health concerns."
-
-            elif parameter == "Phosphate":
-                if value <= 0.02:
-                    param_comment = "Phosphate levels are very low and well within acceptable limits."
-                elif 0.02 < value <= 0.1:
-                    param_comment = "Phosphate levels are within acceptable limits."
-                elif 0.1 < value <= 0.5:
-                    param_comment = "Phosphate levels are elevated and could contribute to algal blooms."
-                elif value > 0.5:
-                    param_comment = "Phosphate levels are high, significantly increasing the risk of nuisance algal blooms."
-
-            elif parameter == "Total Coliforms":
-                if value == 0:
-                    param_comment = "Total coliforms are not detected, indicating excellent sanitary quality."
-                elif 0 < value <= 10:
-                    param_comment = "Low levels of total coliforms detected, suggesting a potential for minor contamination."
-                elif value > 10:
-                    param_comment = "High levels of total coliforms, indicating likely fecal contamination and the need for further investigation."
-
-            elif parameter == "E. coli":
-                if value == 0:
-                    param_comment = "E. coli is not detected, indicating the water is likely safe from recent fecal contamination."
-                elif value > 0:
-                    param_comment = "E. coli is detected, indicating fecal contamination and a potential risk of waterborne illness. This requires immediate attention."
-
-            elif parameter == "BOD":
-                if value <= 1:
-                    param_comment = "BOD is very low, indicating excellent water quality with minimal organic pollution."
-                elif 1 < value <= 3:
-                    param_comment = "BOD is low, indicating good water quality with minimal organic pollution."
-                elif 3 < value <= 8:
-                    param_comment = "BOD is moderate, suggesting some organic pollution that could impact dissolved oxygen levels."
-                elif value > 8:
-                    param_comment = "BOD is high, indicating significant organic pollution and a potential for oxygen depletion."
-
-            elif parameter == "COD":
-                if value <= 1:
-                    param_comment = "COD is very low, indicating very clean water with minimal chemical pollutants."
-                elif 1 < value <= 5:
-                    param_comment = "COD is low, indicating minimal chemical pollutants."
-                elif 5 < value <= 20:
-                    param_comment = "COD is moderate, suggesting the presence of some chemical pollutants."
-                elif value > 20:
-                    param_comment = "COD is high, indicating significant chemical pollution that may require treatment."
-
-            elif parameter == "Hardness":
-                if value <= 60:
-                    param_comment = "Water is soft, which is generally good but may lack some minerals."
-                elif 60 < value <= 120:
-                    param_comment = "Water is moderately hard, generally considered good for consumption."
-                elif 120 < value <= 180:
-                    param_comment = "Water is hard, which may lead to scale buildup."
-                elif value > 180:
-                    param_comment = "Water is very hard, likely to cause significant scale buildup and may affect soap effectiveness."
-
-            elif parameter == "Alkalinity":
-                if value < 20:
-                    param_comment = "Alkalinity is low, making the water susceptible to pH changes."
-                elif 20 <= value <= 100:
-                    param_comment = "Alkalinity is within the optimal range, providing good buffering capacity."
-                elif 100 < value <= 200:
-                    param_comment = "Alkalinity is slightly elevated but generally acceptable."
-                elif value > 200:
-                    param_comment = "Alkalinity is high, which may be associated with high pH and can affect the taste of water."
-
-            elif parameter == "Iron":
-                if value <= 0.1:
-                    param_comment = "Iron levels are very low, unlikely to cause any issues."
-                elif 0.1 < value <= 0.3:
-                    param_comment = "Iron levels are low, with a minimal risk of staining or taste issues."
-                elif 0.3 < value <= 1.0:
-                    param_comment = "Iron levels are moderate and may cause noticeable staining in plumbing fixtures."
-                elif value > 1.0:
-                    param_comment = "Iron levels are high, likely causing significant staining and a metallic taste."
-
-            else:
+            if thresholds is None:
                 param_comment = "No specific comment available for this parameter."
+            elif comment_index is not None:
+                param_comment = comments[comment_index[index]]
+            else:
+                param_comment = comments[bisect_left(thresholds, value)]
 
-            report += (
+            parts.append(
                 f"\n{parameter}:\n"
                 f"    Measured Value: {value} {unit}\n"
                 f"    Quality Rating (Qi): {qi:.2f} (out of 100)\n"
@@ -326,40 +740,154 @@ class WaterQualityEvaluator:
                 f"    Interpretation: {param_comment}\n"
             )
 
-        return report
+        return "".join(parts), contributions
 
     def validate_data(self, data):
         """
         Validates the input data dictionary against defined quality ranges.
         """
-        for parameter, value in data.items():
-            if parameter not in self.quality_ratings:
-                raise ValueError(f"Warning: Unknown parameter '{parameter}' found in data.")
+        if not set(map(type, data.values())) <= {int, float} or data.keys() - self.quality_ratings.keys():
+            # Walk the items only to report the first offending one
+            for parameter, value in data.items():
+                if parameter not in self.quality_ratings:
+                    raise ValueError(f"Warning: Unknown parameter '{parameter}' found in data.")
+
+                if value is None:
+                    raise ValueError(f"No value found for parameter '{parameter}'.")
+
+                if not isinstance(value, (int, float)):
+                    raise ValueError(f"Non-numeric value '{value}' found for parameter '{parameter}'.")
+
+        try:
+            finite = all(map(math.isfinite, data.values()))
+        except OverflowError:  # ints too large for a float
+            finite = False
+        if not finite:
+            for parameter, value in data.items():
+                try:
+                    if math.isfinite(value):
+                        continue
+                except OverflowError:
+                    pass
+                raise ValueError(f"Non-finite value '{value}' found for parameter '{parameter}'.")
+
+    def plot_parameter_contributions(self, data, quality_score, qi=None, contributions=None, engine="pillow", result=None):
+        """
+        Plots the contributions of each parameter to the overall quality score
+        and returns the chart as a base64 encoded PNG. The default engine draws
+        the bars directly with Pillow; engine="matplotlib" renders the chart
+        with Matplotlib instead.
+        """
+        if contributions is not None:
+            parameter_contributions = contributions
+        else:
+            if result is not None:
+                weighted = result.weighted
+            else:
+                weighted = (self.rate(data) if qi is None else qi) * self._w
+            weighted = weighted.tolist()
+            parameter_contributions = {
+                parameter: weighted[self._index[parameter]]
+                for parameter in data
+                if parameter in self.weights
+            }
+        title = f"Overall Quality Score: {quality_score:.2f} (Parameter Contributions)"
+
+        if engine == "pillow":
+            return self._render_bars(parameter_contributions, title)
+        if engine == "matplotlib":
+            return self._render_bars_matplotlib(parameter_contributions, title)
+        raise ValueError(f"Unknown plotting engine '{engine}'.")
+
+    def _render_bars(self, contributions, title):
+        """
+        Draws the contributions bar chart with Pillow.
+        """
+        width, height = CHART_SIZE
+        left, top, right, bottom = CHART_MARGINS
+        plot_w, plot_h = width - left - right, height - top - bottom
+        x_axis, y_axis = height - bottom, left
+
+        img = Image.new("RGB", CHART_SIZE, "white")
+        draw = ImageDraw.Draw(img)
+        font = _chart_font(12)
+
+        # Y axis with ticks on a rounded scale
+        y_max = max(max(contributions.values(), default=0), 1e-9)
+        step = _tick_step(y_max)
+        y_top = step * math.ceil(y_max / step)
+        scale = plot_h / y_top
+        tick = 0.0
+        while tick <= y_top + step / 2:
+            y = x_axis - tick * scale
+            draw.line([(y_axis - 5, y), (y_axis, y)], fill="black")
+            draw.text((y_axis - 8, y), f"{tick:g}", fill="black", font=font, anchor="rm")
+            tick += step
+        draw.line([(y_axis, top), (y_axis, x_axis)], fill="black")
+        draw.line([(y_axis, x_axis), (width - right, x_axis)], fill="black")
+
+        # Bars with rotated labels underneath
+        slot = plot_w / max(len(contributions), 1)
+        for i, (parameter, value) in enumerate(contributions.items()):
+            x0 = y_axis + i * slot + slot * 0.1
+            x1 = y_axis + (i + 1) * slot - slot * 0.1
+            draw.rectangle([x0, x_axis - value * scale, x1, x_axis], fill=BAR_COLOR)
+            label = _rotated_label(parameter, 12)
+            center = (x0 + x1) / 2
+            img.paste((0, 0, 0), (int(center - label.width), int(x_axis + 6)), mask=label)
+
+        title_font = _chart_font(16)
+        draw.text((width / 2, top / 2), title, fill="black", font=title_font, anchor="mm")
+        draw.text((y_axis + plot_w / 2, height - 12), "Parameters", fill="black", font=font, anchor="ms")
+        y_label = _rotated_label("Contribution to Quality Score", 12, angle=90)
+        img.paste((0, 0, 0), (6, int(top + (plot_h - y_label.height) / 2)), mask=y_label)
+
+        buffer = io.BytesIO()
+        img.save(buffer, "PNG", compress_level=1)
+        return b64encode(buffer.getvalue()).decode()
+
+    def _render_bars_matplotlib(self, contributions, title):
+        """
+        Draws the contributions bar chart with Matplotlib.
+        """
+        canvas, ax = _matplotlib_axes()
+        ax.clear()
+        ax.bar(contributions.keys(), contributions.values())
+        ax.set_xlabel("Parameters")
+        ax.set_ylabel("Contribution to Quality Score")
+        ax.set_title(title)
+        for label in ax.get_xticklabels():
+            label.set_rotation(45)
+            label.set_horizontalalignment("right")
+        bytes = io.BytesIO()
+        canvas.print_png(bytes, pil_kwargs={"compress_level": 1})
+        return b64encode(bytes.getvalue()).decode()
 
-            if value is None:
-                raise ValueError(f"No value found for parameter '{parameter}'.")
 
-            if not isinstance(value, (int, float)):
-                raise ValueError(f"Non-numeric value '{value}' found for parameter '{parameter}'.")
+@cache
+def get_default_evaluator():
+    """
+    Returns a shared WaterQualityEvaluator with the default weights and
+    quality ratings, so the evaluator is only built and validated once.
+    """
+    return WaterQualityEvaluator()
 
-    def plot_parameter_contributions(self, data, quality_score):
-        """
-        Plots the contributions of each parameter to the overall quality score.
-        """
-        parameter_contributions = {
-            parameter: self.calculate_quality_rating(parameter, value) * self.weights[parameter]
-            for parameter, value in data.items()
-            if parameter in self.weights
-        }
 
-        plt.figure(figsize=(10, 6))
-        plt.bar(parameter_contributions.keys(), parameter_contributions.values())
-        plt.xlabel("Parameters")
-        plt.ylabel("Contribution to Quality Score")
-        plt.title(f"Overall Quality Score: {quality_score:.2f} (Parameter Contributions)")
-        plt.xticks(rotation=45, ha="right")
-        plt.tight_layout()
-        bytes = io.BytesIO()
-        plt.savefig(bytes, format='png')
-        bytes.seek(0)
-        return base64.b64encode(bytes.read()).decode()
\ No newline at end of file
+def compile_kernels(parallel=False):
+    """
+    Compiles the Numba rating kernels (or loads them from Numba's on-disk
+    cache), so the first rating does not pay for it. Does nothing when
+    Numba is not installed. The parallel batch kernel, only used for
+    batches of at least _PARALLEL_MIN_ROWS samples, is left out unless
+    parallel is true: it starts Numba's thread pool, so call it once per
+    worker process, after forking and from the main thread (with the TBB
+    threading layer, a pool first started from another thread can hang the
+    process at exit).
+    """
+    if njit is not None:
+        evaluator = get_default_evaluator()
+        evaluator.rate({})
+        evaluator.rate_batch([{}])
+        if parallel:
+            with _parallel_lock:
+                _rate_batch_kernel_parallel(np.full((1, len(evaluator.parameters)), np.nan), *evaluator._kernel_args)